@@ -49,65 +49,87 @@ def extract_token_address(message):
         return evm_match.group(0)
     return None
 
-def save_address_message(group_name, address, num_participants, message, metadata):
-    token_type = identify_token_type(message)
+def token_type_for_address(address):
+    # Classify an already extracted address without fetching any metadata
+    if re.fullmatch(EVM_ADDRESS_PATTERN, address):
+        return "EVM"
+    elif re.fullmatch(SOLANA_ADDRESS_PATTERN, address):
+        return "Solana"
+    else:
+        return "Unknown"
 
+def load_addresses():
     # Check if the file exists
     if not os.path.exists('addresses.json'):
-        # Create the file with an empty list if it doesn't exist
-        with open('addresses.json', 'w') as f:
-            json.dump([], f)
+        return []
 
-    # Save or update message to JSON file
-    with open('addresses.json', 'r+') as f:
+    with open('addresses.json', 'r') as f:
         try:
-            addresses = json.load(f)
+            return json.load(f)
         except json.JSONDecodeError:
-            addresses = []
-
-        # Check for existing entries
-        entry_exists = False
-        for entry in addresses:
-            if entry['address'] == address:
-                # If the address exists, update the entry
-                entry_exists = True
-                if 'groups' not in entry:
-                    entry['groups'] = []
-                # Check if the group already exists in the entry
-                group_exists = any(g['group_name'] == group_name for g in entry['groups'])
-                if not group_exists:
-                    entry['groups'].append({
-                        'group_name': group_name,
-                        'num_participants': num_participants
-                    })
-                entry['number_groups'] = len(entry['groups'])
-
-                # Update the metadata
-                entry.update(metadata)
-                break
-
-        if not entry_exists:
-            # Append new entry if not found
-            new_entry = {
-                'address': address,
-                'token_type': token_type,
-                'number_groups': 1,
-                'groups': [{
-                    'group_name': group_name,
-                    'num_participants': num_participants
-                }]
-            }
-            # Add metadata to the new entry
-            new_entry.update(metadata)
-            addresses.append(new_entry)
-
-        f.seek(0)
-        f.truncate()  # Clear the file before writing
+            return []
+
+def write_addresses(addresses):
+    # Write to a temporary file first so an interrupted write never truncates the store
+    with open('addresses.json.tmp', 'w') as f:
         json.dump(addresses, f, indent=4)
+    os.replace('addresses.json.tmp', 'addresses.json')
+
+def update_address_entry(addresses, group_name, address, num_participants, token_type, metadata, index=None):
+    # Check for existing entries, bulk callers pass an address -> entry index instead of scanning
+    if index is not None:
+        entry = index.get(address)
+    else:
+        entry = next((entry for entry in addresses if entry['address'] == address), None)
 
+    if entry:
+        # If the address exists, update the entry
+        if 'groups' not in entry:
+            entry['groups'] = []
+        # Check if the group already exists in the entry
+        group_exists = any(g['group_name'] == group_name for g in entry['groups'])
+        if not group_exists:
+            entry['groups'].append({
+                'group_name': group_name,
+                'num_participants': num_participants
+            })
+        entry['number_groups'] = len(entry['groups'])
+
+        # Update the metadata
+        entry.update(metadata)
+        return entry
+
+    # Append new entry if not found
+    new_entry = {
+        'address': address,
+        'token_type': token_type,
+        'number_groups': 1,
+        'groups': [{
+            'group_name': group_name,
+            'num_participants': num_participants
+        }]
+    }
+    # Add metadata to the new entry
+    new_entry.update(metadata)
+    addresses.append(new_entry)
+    if index is not None:
+        index[address] = new_entry
+    return new_entry
+
+def log_message(group_name, message):
     # Log the message for debugging
     with open('message_log.txt', 'a', encoding='utf-8') as log_file:
         log_file.write(f"Message from group {group_name}:\n{message}\n\n")
 
+def save_address_message(group_name, address, num_participants, message, metadata):
+    token_type = identify_token_type(message)
+
+    # Save or update message to JSON file
+    addresses = load_addresses()
+    update_address_entry(addresses, group_name, address, num_participants, token_type, metadata)
+    write_addresses(addresses)
+
+    log_message(group_name, message)
+
     # Format and send the message
     post_token_message(metadata)
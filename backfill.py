@@ -0,0 +1,226 @@
+import os
+import json
+import argparse
+import asyncio
+from datetime import datetime, timezone
+from functools import partial
+import address_helper
+import sol_helper
+import main
+from main import client, phone_number, ignore_chat_ids, get_num_participants
+
+# File used to resume a backfill where the previous run stopped
+CHECKPOINT_FILE = 'backfill_checkpoint.json'
+
+# Number of messages enriched together, and batches processed per group between writes
+BATCH_SIZE = 200
+SAVE_EVERY_BATCHES = 10
+
+# Limits for concurrent metadata lookups and concurrently walked groups
+DEFAULT_CONCURRENCY = 8
+DEFAULT_GROUP_CONCURRENCY = 4
+
+# Failed metadata lookups (rate limits, timeouts) are retried with exponential backoff
+MAX_RETRIES = 4
+RETRY_DELAY = 2
+LOOKUP_TIMEOUT = 60
+
+# Function to read the checkpoint, maps chat IDs to the last processed message ID
+def read_checkpoint():
+    if not os.path.exists(CHECKPOINT_FILE):
+        return {}
+    with open(CHECKPOINT_FILE, 'r') as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError:
+            return {}
+
+def write_checkpoint(checkpoint):
+    # Write to a temporary file first so an interrupted write never truncates the checkpoint
+    with open(CHECKPOINT_FILE + '.tmp', 'w') as f:
+        json.dump(checkpoint, f, indent=4)
+    os.replace(CHECKPOINT_FILE + '.tmp', CHECKPOINT_FILE)
+
+def parse_date(value):
+    date = datetime.fromisoformat(value)
+    # Telegram message dates are timezone aware (UTC)
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date
+
+async def fetch_metadata(address, semaphore):
+    loop = asyncio.get_running_loop()
+    for attempt in range(1, MAX_RETRIES + 1):
+        async with semaphore:
+            try:
+                # get_token_metadata is blocking, run it in the default thread pool
+                lookup = loop.run_in_executor(None, partial(sol_helper.get_token_metadata, address, include_market_data=False))
+                metadata = await asyncio.wait_for(lookup, LOOKUP_TIMEOUT)
+            except Exception as e:
+                error = e
+            else:
+                if metadata:
+                    metadata['address'] = address
+                # None marks a base58 string that is not a token, so it is not looked up again
+                return address, metadata or None
+        print(f"Error fetching token metadata for {address} (attempt {attempt}/{MAX_RETRIES}): {error}")
+        if attempt < MAX_RETRIES:
+            # Back off outside the semaphore so other lookups keep going
+            await asyncio.sleep(RETRY_DELAY * 2 ** (attempt - 1))
+    raise Exception(f"Token metadata lookup failed for {address}: {error}")
+
+async def enrich_addresses(addresses, metadata_cache, semaphore):
+    pending = set()
+    for address in addresses:
+        if address in metadata_cache:
+            continue
+        if address_helper.token_type_for_address(address) == "EVM":
+            metadata_cache[address] = {"address": address}
+        else:
+            pending.add(address)
+
+    results = await asyncio.gather(*(fetch_metadata(address, semaphore) for address in pending), return_exceptions=True)
+    # Only completed lookups are cached, a failed one stops the batch so it is retried later
+    metadata_cache.update(result for result in results if not isinstance(result, Exception))
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+
+async def process_batch(store, index, group_name, num_participants, messages, metadata_cache, semaphore):
+    found = []
+    for message in messages:
+        text = message.message
+        if not text:
+            continue
+        address = address_helper.extract_token_address(text)
+        if address:
+            found.append((address, text))
+
+    await enrich_addresses([address for address, _ in found], metadata_cache, semaphore)
+
+    stored = 0
+    for address, text in found:
+        metadata = metadata_cache[address]
+        # Like the live listener, only store Solana matches that resolved to a token
+        if metadata is None:
+            continue
+        token_type = address_helper.token_type_for_address(address)
+        address_helper.update_address_entry(store, group_name, address, num_participants, token_type, metadata, index)
+        address_helper.log_message(group_name, text)
+        stored += 1
+
+    return stored
+
+async def backfill_group(dialog, store, index, checkpoint, metadata_cache, semaphore, group_semaphore, since=None, until=None, limit=None):
+    async with group_semaphore:
+        chat_id = dialog.id
+        group_name = dialog.name
+        num_participants = await get_num_participants(chat_id, dialog.is_channel)
+        min_id = checkpoint.get(str(chat_id), 0)
+        print(f"Backfilling {group_name} from message ID {min_id}")
+
+        total_messages = 0
+        total_addresses = 0
+        processed_id = None
+        unsaved_batches = 0
+
+        def save():
+            nonlocal processed_id, unsaved_batches
+            if processed_id is None:
+                return
+            # Store is written before the checkpoint so a crash never skips messages
+            address_helper.write_addresses(store)
+            checkpoint[str(chat_id)] = processed_id
+            write_checkpoint(checkpoint)
+            processed_id = None
+            unsaved_batches = 0
+
+        async def flush(batch):
+            nonlocal total_messages, total_addresses, processed_id, unsaved_batches
+            total_addresses += await process_batch(store, index, group_name, num_participants, batch, metadata_cache, semaphore)
+            total_messages += len(batch)
+            processed_id = batch[-1].id
+            unsaved_batches += 1
+            if unsaved_batches >= SAVE_EVERY_BATCHES:
+                save()
+
+        try:
+            batch = []
+            # reverse=True walks oldest to newest, offset_date then means "after this date"
+            async for message in client.iter_messages(dialog.entity, reverse=True, min_id=min_id, offset_date=since, limit=limit):
+                if until and message.date > until:
+                    break
+                batch.append(message)
+                if len(batch) >= BATCH_SIZE:
+                    await flush(batch)
+                    batch = []
+            if batch:
+                await flush(batch)
+        except Exception as e:
+            # The checkpoint stays before the failed batch, the next run resumes from there
+            print(f"Error backfilling {group_name}, the next run resumes after the last processed batch: {e}")
+        finally:
+            save()
+
+        print(f"Finished {group_name}: {total_messages} messages, {total_addresses} addresses")
+
+def select_dialogs(dialogs, groups):
+    selected = []
+    for dialog in dialogs:
+        if not (dialog.is_group or dialog.is_channel) or dialog.id in ignore_chat_ids:
+            continue
+        if groups and str(dialog.id) not in groups and dialog.name not in groups:
+            continue
+        selected.append(dialog)
+    return selected
+
+async def run_backfill(args):
+    await client.start(phone_number)
+    print("Client Created")
+
+    dialogs = select_dialogs(await client.get_dialogs(), args.groups)
+    print(f"Backfilling {len(dialogs)} groups")
+
+    store = address_helper.load_addresses()
+    index = {entry['address']: entry for entry in store}
+    checkpoint = read_checkpoint()
+    if args.no_resume:
+        # Only restart the selected groups, progress of the others is kept on disk
+        for dialog in dialogs:
+            checkpoint.pop(str(dialog.id), None)
+
+    # Addresses already enriched in a previous run are not looked up again
+    metadata_cache = {entry['address']: {} for entry in store if entry.get('name') or entry.get('token_type') == "EVM"}
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    group_semaphore = asyncio.Semaphore(args.group_concurrency)
+    since = parse_date(args.since) if args.since else None
+    until = parse_date(args.until) if args.until else None
+
+    await asyncio.gather(*(
+        backfill_group(dialog, store, index, checkpoint, metadata_cache, semaphore, group_semaphore, since=since, until=until, limit=args.limit)
+        for dialog in dialogs
+    ))
+
+    print(f"Backfill complete, {len(store)} addresses saved to addresses.json")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill addresses.json from group message history")
+    parser.add_argument('groups', nargs='*', help="Group IDs or names to backfill (default: all groups)")
+    parser.add_argument('--since', help="Only process messages after this ISO date")
+    parser.add_argument('--until', help="Only process messages before this ISO date")
+    parser.add_argument('--limit', type=int, help="Maximum number of messages per group")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="Concurrent token metadata lookups")
+    parser.add_argument('--group-concurrency', type=int, default=DEFAULT_GROUP_CONCURRENCY, help="Groups walked at the same time")
+    parser.add_argument('--no-resume', action='store_true', help="Ignore the checkpoint of the selected groups and start from the beginning")
+    return parser.parse_args()
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    # Backfill only reads history, never react to live updates or post anything
+    client.remove_event_handler(main.group_message_handler)
+    client.remove_event_handler(main.chat_action_handler)
+
+    with client:
+        client.loop.run_until_complete(run_backfill(args))
@@ -0,0 +1,342 @@
+import os
+import json
+import time
+import base64
+import struct
+import asyncio
+import hashlib
+import logging
+import itertools
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+import requests
+import websockets
+import pump_fun_scraper
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Get the Solana RPC URLs from environment variables, the WebSocket URL defaults to the RPC URL
+solana_rpc_url = os.getenv('RPC_URL')
+solana_ws_url = os.getenv('WS_RPC_URL')
+if not solana_ws_url and solana_rpc_url:
+    solana_ws_url = solana_rpc_url.replace('https://', 'wss://').replace('http://', 'ws://')
+
+PUMP_FUN_PROGRAM_ID = '6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P'
+SOL_MINT = 'So11111111111111111111111111111111111111112'
+
+# pump.fun tokens have 6 decimals, 793,100,000 of them are sold through the curve
+TOKEN_DECIMALS = 6
+LAMPORTS_PER_SOL = 10 ** 9
+INITIAL_REAL_TOKEN_RESERVES = 793_100_000 * 10 ** TOKEN_DECIMALS
+
+# Anchor discriminator followed by the reserves and the completion flag
+BONDING_CURVE_LAYOUT = struct.Struct('<8sQQQQQ?')
+# Newer curves store the creator right after the completion flag
+BONDING_CURVE_CREATOR_LAYOUT = struct.Struct('<32s')
+
+# Number of recently seen tokens that keep a live subscription
+MAX_TRACKED_TOKENS = 100
+RECONNECT_DELAY = 5
+SOL_PRICE_TTL = 60
+
+BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+
+def b58decode(value):
+    number = 0
+    for char in value:
+        number = number * 58 + BASE58_ALPHABET.index(char)
+    leading_zeros = len(value) - len(value.lstrip('1'))
+    return b'\0' * leading_zeros + number.to_bytes((number.bit_length() + 7) // 8, 'big')
+
+def b58encode(data):
+    number = int.from_bytes(data, 'big')
+    encoded = ''
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = BASE58_ALPHABET[remainder] + encoded
+    leading_zeros = len(data) - len(data.lstrip(b'\0'))
+    return '1' * leading_zeros + encoded
+
+def is_on_curve(key):
+    # Check whether 32 bytes decompress to an ed25519 point, program addresses must not
+    p = 2 ** 255 - 19
+    d = -121665 * pow(121666, p - 2, p) % p
+    y = int.from_bytes(key, 'little') & ((1 << 255) - 1)
+    if y >= p:
+        return False
+    x2 = (y * y - 1) * pow(d * y * y + 1, p - 2, p) % p
+    return x2 == 0 or pow(x2, (p - 1) // 2, p) == 1
+
+def find_program_address(seeds, program_id):
+    program_bytes = b58decode(program_id)
+    for bump in range(255, -1, -1):
+        key = hashlib.sha256(b''.join(seeds) + bytes([bump]) + program_bytes + b'ProgramDerivedAddress').digest()
+        if not is_on_curve(key):
+            return b58encode(key), bump
+    raise Exception(f"Unable to find a program address for program {program_id}")
+
+def get_bonding_curve_address(token_mint_address):
+    address, _ = find_program_address([b'bonding-curve', b58decode(token_mint_address)], PUMP_FUN_PROGRAM_ID)
+    return address
+
+def decode_bonding_curve(data):
+    if len(data) < BONDING_CURVE_LAYOUT.size:
+        return None
+    _, virtual_token_reserves, virtual_sol_reserves, real_token_reserves, real_sol_reserves, token_total_supply, complete = BONDING_CURVE_LAYOUT.unpack_from(data)
+    creator = None
+    if len(data) >= BONDING_CURVE_LAYOUT.size + BONDING_CURVE_CREATOR_LAYOUT.size:
+        creator_bytes, = BONDING_CURVE_CREATOR_LAYOUT.unpack_from(data, BONDING_CURVE_LAYOUT.size)
+        if any(creator_bytes):
+            creator = b58encode(creator_bytes)
+    return {
+        'virtual_token_reserves': virtual_token_reserves,
+        'virtual_sol_reserves': virtual_sol_reserves,
+        'real_token_reserves': real_token_reserves,
+        'real_sol_reserves': real_sol_reserves,
+        'token_total_supply': token_total_supply,
+        'complete': complete,
+        'creator': creator
+    }
+
+def compute_market_data(curve, sol_price=None):
+    if curve['complete']:
+        progress = 100
+    else:
+        progress = 100 - (curve['real_token_reserves'] * 100 / INITIAL_REAL_TOKEN_RESERVES)
+        progress = max(0, min(100, progress))
+
+    data = {'bonding_curve_progress': f"{progress:.2f}%"}
+
+    if curve['virtual_token_reserves'] and sol_price:
+        price_sol = (curve['virtual_sol_reserves'] / LAMPORTS_PER_SOL) / (curve['virtual_token_reserves'] / 10 ** TOKEN_DECIMALS)
+        market_cap_sol = price_sol * curve['token_total_supply'] / 10 ** TOKEN_DECIMALS
+        data['market_cap'] = market_cap_sol * sol_price
+        data['liquidity'] = curve['real_sol_reserves'] / LAMPORTS_PER_SOL * sol_price
+    return data
+
+_sol_price = None
+_sol_price_fetched_at = 0
+
+def get_sol_price():
+    global _sol_price, _sol_price_fetched_at
+    if _sol_price is not None and time.time() - _sol_price_fetched_at < SOL_PRICE_TTL:
+        return _sol_price
+
+    url = f'https://api.geckoterminal.com/api/v2/simple/networks/solana/token_price/{SOL_MINT}'
+    headers = {'accept': 'application/json'}
+    try:
+        response = requests.get(url, headers=headers)
+        response.raise_for_status()
+        _sol_price = float(response.json()['data']['attributes']['token_prices'][SOL_MINT])
+        _sol_price_fetched_at = time.time()
+    except Exception as e:
+        # Keep using the last known price rather than dropping market data
+        logging.error(f"SOL price request error: {e}")
+    return _sol_price
+
+# Live bonding curve state for recently seen pump.fun tokens. Every tracked token has an
+# accountSubscribe on its bonding curve account, all multiplexed over one WebSocket connection.
+class BondingCurveFeed:
+    def __init__(self, ws_url, rpc_url, max_tracked=MAX_TRACKED_TOKENS):
+        self.ws_url = ws_url
+        self.rpc_url = rpc_url
+        self.max_tracked = max_tracked
+        # mint -> {'account', 'slot', 'curve'}, oldest first
+        self.tokens = OrderedDict()
+        self._subscriptions = {}  # subscription ID -> mint
+        self._pending = {}  # request ID -> mint
+        self._request_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._outgoing = None
+
+    # Returns False when the bonding curve account does not exist, None when that is unknown
+    def track(self, token_mint_address):
+        evicted = []
+        with self._lock:
+            token = self.tokens.get(token_mint_address)
+            if token:
+                self.tokens.move_to_end(token_mint_address)
+                account = token['account']
+                # Notifications keep the curve current once it has been seeded
+                if token['curve']:
+                    return True
+            else:
+                account = get_bonding_curve_address(token_mint_address)
+                self.tokens[token_mint_address] = {'account': account, 'slot': 0, 'curve': None}
+                self._send(self._subscribe_request(token_mint_address))
+                evicted = list(self.tokens)[:-self.max_tracked] if len(self.tokens) > self.max_tracked else []
+
+        for mint in evicted:
+            self.untrack(mint)
+
+        # Seed with the current state, notifications only arrive once the account changes
+        try:
+            slot, value = self._fetch_account(account)
+        except Exception as e:
+            logging.error(f"Error fetching bonding curve for {token_mint_address}: {e}")
+            return None
+        if not value:
+            return False
+
+        curve = self._decode_value(value)
+        if curve:
+            self._update(token_mint_address, slot, curve)
+        return True
+
+    def untrack(self, token_mint_address):
+        with self._lock:
+            self.tokens.pop(token_mint_address, None)
+            for subscription_id, mint in list(self._subscriptions.items()):
+                if mint == token_mint_address:
+                    del self._subscriptions[subscription_id]
+                    self._send(self._unsubscribe_request(subscription_id))
+
+    def get_curve(self, token_mint_address):
+        token = self.tokens.get(token_mint_address)
+        return token['curve'] if token else None
+
+    def get_market_data(self, token_mint_address, sol_price=None):
+        curve = self.get_curve(token_mint_address)
+        if not curve:
+            return None
+        return compute_market_data(curve, sol_price)
+
+    def _subscribe_request(self, token_mint_address):
+        request_id = next(self._request_ids)
+        self._pending[request_id] = token_mint_address
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": "accountSubscribe",
+            "params": [
+                self.tokens[token_mint_address]['account'],
+                {"encoding": "base64", "commitment": "confirmed"}
+            ]
+        }
+
+    def _unsubscribe_request(self, subscription_id):
+        return {
+            "jsonrpc": "2.0",
+            "id": next(self._request_ids),
+            "method": "accountUnsubscribe",
+            "params": [subscription_id]
+        }
+
+    def _send(self, message):
+        # Requests made while disconnected are replayed from self.tokens on connect
+        if self._loop and self._outgoing:
+            self._loop.call_soon_threadsafe(self._outgoing.put_nowait, json.dumps(message))
+
+    def _fetch_account(self, account):
+        payload = {
+            "jsonrpc": "2.0",
+            "id": "my-id",
+            "method": "getAccountInfo",
+            "params": [account, {"encoding": "base64", "commitment": "confirmed"}]
+        }
+        headers = {
+            "Content-Type": "application/json"
+        }
+        response = requests.post(self.rpc_url, json=payload, headers=headers)
+        if response.status_code == 200:
+            response_json = response.json()
+            if "error" in response_json:
+                raise Exception(f"Error fetching bonding curve account: {response_json['error']}")
+            result = response_json.get("result") or {}
+            return result.get("context", {}).get("slot", 0), result.get("value")
+        else:
+            raise Exception(f"Error fetching bonding curve account: {response.status_code}, {response.text}")
+
+    def _decode_value(self, value):
+        if not value:
+            return None
+        return decode_bonding_curve(base64.b64decode(value['data'][0]))
+
+    def _update(self, token_mint_address, slot, curve):
+        with self._lock:
+            token = self.tokens.get(token_mint_address)
+            # The seeding fetch and notifications can race, keep the newest state
+            if token and slot >= token['slot']:
+                token['slot'] = slot
+                token['curve'] = curve
+
+    def _handle_message(self, message):
+        if message.get('method') == 'accountNotification':
+            params = message['params']
+            mint = self._subscriptions.get(params['subscription'])
+            curve = self._decode_value(params['result'].get('value'))
+            if mint and curve:
+                self._update(mint, params['result']['context']['slot'], curve)
+        elif message.get('id') in self._pending:
+            with self._lock:
+                mint = self._pending.pop(message['id'])
+                if 'result' not in message:
+                    logging.error(f"Bonding curve subscription failed for {mint}: {message.get('error')}")
+                elif mint in self.tokens:
+                    self._subscriptions[message['result']] = mint
+                else:
+                    # Untracked before the subscription was confirmed
+                    self._send(self._unsubscribe_request(message['result']))
+
+    async def _writer(self, ws):
+        while True:
+            message = await self._outgoing.get()
+            await ws.send(message)
+
+    async def _reader(self, ws):
+        async for raw in ws:
+            self._handle_message(json.loads(raw))
+
+    async def run(self):
+        self._loop = asyncio.get_running_loop()
+        while True:
+            try:
+                async with websockets.connect(self.ws_url) as ws:
+                    with self._lock:
+                        self._subscriptions.clear()
+                        self._pending.clear()
+                        self._outgoing = asyncio.Queue()
+                        for mint, token in self.tokens.items():
+                            # Changes made while disconnected are never notified, track() re-seeds these
+                            token['curve'] = None
+                            self._outgoing.put_nowait(json.dumps(self._subscribe_request(mint)))
+                    logging.info(f"Bonding curve feed connected, tracking {len(self.tokens)} tokens")
+
+                    tasks = [asyncio.ensure_future(self._writer(ws)), asyncio.ensure_future(self._reader(ws))]
+                    try:
+                        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        for task in tasks:
+                            task.cancel()
+                    for task in done:
+                        task.result()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Bonding curve feed error: {e}")
+            finally:
+                self._outgoing = None
+            await asyncio.sleep(RECONNECT_DELAY)
+
+feed = BondingCurveFeed(solana_ws_url, solana_rpc_url)
+
+def get_market_data(token_mint_address):
+    if feed.track(token_mint_address) is False:
+        # Not a pump.fun token, do not hold a subscription slot for it
+        feed.untrack(token_mint_address)
+        return None
+
+    curve = feed.get_curve(token_mint_address)
+    if not curve:
+        return None
+
+    # Migrated tokens trade on a pool, the curve no longer moves
+    if curve['complete']:
+        logging.info("Bonding curve is complete, using API data instead.")
+        feed.untrack(token_mint_address)
+        return pump_fun_scraper.get_data_from_api(token_mint_address)
+
+    return feed.get_market_data(token_mint_address, get_sol_price())
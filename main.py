@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 from telethon import TelegramClient, events
 from telethon.tl.types import MessageEntityTextUrl
 import address_helper  # Import the address_helper module
+import bonding_curve
 from telethon.errors import ChatAdminRequiredError, ChannelPrivateError
 from telethon.tl.functions.channels import GetFullChannelRequest
 from telethon.tl.functions.messages import GetFullChatRequest
@@ -31,6 +32,9 @@ ignore_chat_ids = {own_chat_id}
 # Flag to indicate if a message is being processed
 is_processing_message = False
 
+# Task running the bonding curve feed while the client is connected
+bonding_curve_task = None
+
 class CustomJSONEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, datetime):
@@ -39,6 +43,22 @@ class CustomJSONEncoder(json.JSONEncoder):
             return obj.decode('utf-8', errors='ignore')
         return super(CustomJSONEncoder, self).default(obj)
 
+async def get_num_participants(chat_id, is_channel):
+    try:
+        # Get number of participants/subscribers
+        if is_channel:
+            full_channel = await client(GetFullChannelRequest(channel=chat_id))
+            return full_channel.full_chat.participants_count
+        else:
+            full_chat = await client(GetFullChatRequest(chat_id=chat_id))
+            return full_chat.full_chat.participants_count
+    except (ChatAdminRequiredError, ChannelPrivateError):
+        # If we don't have permission to get participants, set to unknown
+        return "unknown"
+    except Exception as e:
+        print(f"Error retrieving participants: {e}")
+        return "unknown"
+
 # Event handler for new messages in groups and channels
 @client.on(events.NewMessage(chats=group_ids))
 async def group_message_handler(event):
@@ -57,21 +77,7 @@ async def group_message_handler(event):
         token_type = address_helper.identify_token_type(message_text)
         address = address_helper.extract_token_address(message_text)
         if address:
-            try:
-                # Get number of participants/subscribers
-                if event.is_channel:
-                    full_channel = await client(GetFullChannelRequest(channel=event.chat_id))
-                    num_participants = full_channel.full_chat.participants_count
-                else:
-                    full_chat = await client(GetFullChatRequest(chat_id=event.chat_id))
-                    num_participants = full_chat.full_chat.participants_count
-            except (ChatAdminRequiredError, ChannelPrivateError):
-                # If we don't have permission to get participants, set to unknown
-                num_participants = "unknown"
-            except Exception as e:
-                print(f"Error retrieving participants: {e}")
-                num_participants = "unknown"
-            
+            num_participants = await get_num_participants(event.chat_id, event.is_channel)
             address_helper.save_address_message(group_name, address, num_participants, message_text, metadata if metadata else {})
 
     is_processing_message = False  # Reset the flag once message processing is complete
@@ -100,7 +106,12 @@ async def chat_action_handler(event):
                     json.dump(groups, f, indent=4)
                 print(f"Joined new group: {dialog.title}")
 
+def report_task_error(task):
+    if not task.cancelled() and task.exception():
+        print(f"Bonding curve feed stopped: {task.exception()}")
+
 async def main():
+    global bonding_curve_task
     # Log in to your account
     await client.start(phone_number)
     print("Client Created")
@@ -131,8 +142,15 @@ async def main():
     client.remove_event_handler(group_message_handler)
     client.add_event_handler(group_message_handler, events.NewMessage(chats=group_ids))
 
+    # Keep bonding curve data of recently seen tokens current
+    bonding_curve_task = client.loop.create_task(bonding_curve.feed.run())
+    bonding_curve_task.add_done_callback(report_task_error)
+
     # Keep the client running
-    await client.run_until_disconnected()
+    try:
+        await client.run_until_disconnected()
+    finally:
+        bonding_curve_task.cancel()
 
 if __name__ == '__main__':
     with client:
@@ -157,39 +157,41 @@ def format_message(metadata):
             if key in ["Symbol", "Decimals"]:
                 message += "\n"
     
-    # Include top 5 accounts
-    largest_accounts = metadata.get('largest_accounts', [])
-    supply = metadata.get('supply')
-    decimals = metadata.get('decimals')
+    # Include the top holders, curve, LP and other program accounts are not holders
+    holders = metadata.get('holders', [])
     
-    if largest_accounts and supply and decimals is not None:
-        supply_actual = supply
-        
-        message += "\n*Top Accounts:*\n"
+    if holders:
+        message += "\n*Top Holders:*\n"
         account_count = 0
-        for account in largest_accounts:
+        for holder in holders:
             if account_count >= 6:
                 break
             
-            account_address = account.get('address')
-            account_balance = account.get('balance')
-            if account_address and account_balance is not None:
-                account_balance_actual = account_balance
-                balance_percentage = (account_balance_actual / supply_actual) * 100
-                
-                if balance_percentage > 10 or balance_percentage <= 1:
-                    continue
-                
-                account_count += 1
-                message += f"[{balance_percentage:.2f}%](https://solscan.io/account/{account_address}) - "
+            holder_address = holder.get('address')
+            balance_percentage = holder.get('percentage')
+            label = holder.get('label')
+            if not holder_address or balance_percentage is None or label not in (None, "Deployer"):
+                continue
+            
+            account_count += 1
+            dev_tag = " (Dev)" if label == "Deployer" else ""
+            message += f"[{balance_percentage:.2f}%](https://solscan.io/account/{holder_address}){dev_tag} - "
     
     if message.endswith(" - "):
         message = message[:-3]
 
+    top_10_share = metadata.get('top_10_share')
+    deployer_share = metadata.get('deployer_share')
+
+    if top_10_share is not None:
+        message += f"\n*Top 10 Holders:* {top_10_share:.2f}%"
+    if deployer_share is not None:
+        message += f"\n*Deployer Holds:* {deployer_share:.2f}%"
+
     bonding_curve_progress = metadata.get('bonding_curve_progress')
-    one_hour_volume = float(metadata.get('one_hour_volume'))
-    market_cap = float(metadata.get('market_cap'))
-    liquidity = float(metadata.get('liquidity'))
+    one_hour_volume = float(metadata.get('one_hour_volume') or 0)
+    market_cap = float(metadata.get('market_cap') or 0)
+    liquidity = float(metadata.get('liquidity') or 0)
 
     formatted_mcap = "${:,.2f}".format(market_cap)
     formatted_hour_volume = "${:,.2f}".format(one_hour_volume)
@@ -1,8 +1,12 @@
 import os
+import time
+import base64
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
 import requests
 import json
-import pump_fun_scraper
+import bonding_curve
 
 # Load environment variables from .env file
 load_dotenv()
@@ -13,6 +17,17 @@ solana_rpc_url = os.getenv('RPC_URL')
 if not solana_rpc_url:
     raise ValueError("The RPC_URL environment variable is not set")
 
+# Token account owners that are programs rather than holders
+KNOWN_OWNERS = {
+    "5Q544fKrFoe6tsEbD7S8EmxGTJYAKtTVhAW5Q5pge4j1": "Raydium LP"
+}
+
+# Holder analysis per mint, reused for this many seconds, oldest mints are dropped first
+HOLDER_CACHE_TTL = 60
+MAX_CACHED_HOLDERS = 500
+holder_cache = OrderedDict()
+holder_cache_lock = threading.Lock()
+
 def fetch_metadata_from_ipfs(ipfs_uri):
     response = requests.get(ipfs_uri)
     if response.status_code == 200:
@@ -32,12 +47,103 @@ def get_token_largest_accounts(token_mint_address):
     }
     response = requests.post(solana_rpc_url, json=payload, headers=headers)
     if response.status_code == 200:
-        result = response.json().get("result", {}).get("value", [])
+        response_json = response.json()
+        if "error" in response_json:
+            raise Exception(f"Error fetching largest token accounts: {response_json['error']}")
+        result = response_json.get("result", {}).get("value", [])
         return result
     else:
         raise Exception(f"Error fetching largest token accounts: {response.status_code}, {response.text}")
 
-def get_token_metadata(token_mint_address):
+def get_multiple_accounts(addresses):
+    payload = {
+        "jsonrpc": "2.0",
+        "id": "my-id",
+        "method": "getMultipleAccounts",
+        "params": [addresses, {"encoding": "jsonParsed"}]
+    }
+    headers = {
+        "Content-Type": "application/json"
+    }
+    response = requests.post(solana_rpc_url, json=payload, headers=headers)
+    if response.status_code == 200:
+        response_json = response.json()
+        if "error" in response_json:
+            raise Exception(f"Error fetching multiple accounts: {response_json['error']}")
+        result = response_json.get("result", {}).get("value", [])
+        return result
+    else:
+        raise Exception(f"Error fetching multiple accounts: {response.status_code}, {response.text}")
+
+def get_creator_from_curve(curve_info):
+    # The bonding curve is not a token account, jsonParsed returns it as base64
+    data = curve_info.get("data") if curve_info else None
+    if not isinstance(data, list):
+        return None
+    curve = bonding_curve.decode_bonding_curve(base64.b64decode(data[0]))
+    return curve.get("creator") if curve else None
+
+def get_holder_analysis(token_mint_address, supply, deployer=None, top_n=20):
+    with holder_cache_lock:
+        cached = holder_cache.get(token_mint_address)
+    if cached and time.time() - cached[0] < HOLDER_CACHE_TTL:
+        return cached[1]
+
+    largest_accounts = get_token_largest_accounts(token_mint_address)[:top_n]
+    curve_address = bonding_curve.get_bonding_curve_address(token_mint_address)
+    # Resolve the owners of all token accounts and read the bonding curve in one round trip
+    accounts = get_multiple_accounts([account["address"] for account in largest_accounts] + [curve_address])
+    curve_info = accounts[len(largest_accounts)] if len(accounts) > len(largest_accounts) else None
+
+    # pump.fun curves record their creator, other tokens rely on the Metaplex creators
+    deployer = get_creator_from_curve(curve_info) or deployer
+
+    labels = dict(KNOWN_OWNERS)
+    labels[curve_address] = "Bonding Curve"
+    if deployer:
+        labels.setdefault(deployer, "Deployer")
+
+    # Collapse token accounts held by the same owner
+    holders = {}
+    for index, account in enumerate(largest_accounts):
+        account_info = accounts[index] if index < len(accounts) else None
+        data = account_info.get("data") if account_info else None
+        # jsonParsed falls back to raw base64 for accounts it cannot parse, keep the token account then
+        owner = data.get("parsed", {}).get("info", {}).get("owner") if isinstance(data, dict) else None
+        label = labels.get(owner)
+        # Off-curve owners are program derived, e.g. PumpSwap and other AMM pools, not wallets
+        if owner and not label and not bonding_curve.is_on_curve(bonding_curve.b58decode(owner)):
+            label = "Program"
+        owner = owner or account["address"]
+        holder = holders.setdefault(owner, {
+            "address": owner,
+            "balance": 0,
+            "accounts": 0,
+            "label": label
+        })
+        holder["balance"] += account.get("uiAmount") or 0
+        holder["accounts"] += 1
+
+    holders = sorted(holders.values(), key=lambda holder: holder["balance"], reverse=True)
+    for holder in holders:
+        holder["percentage"] = holder["balance"] / supply * 100 if supply else None
+
+    # Curve, LP and other program balances are not held by anyone, leave them out of the concentration
+    wallets = [holder for holder in holders if holder["label"] in (None, "Deployer")]
+    analysis = {
+        "holders": holders,
+        "top_10_share": sum(holder["percentage"] or 0 for holder in wallets[:10]) if supply else None,
+        "deployer_share": sum(holder["percentage"] or 0 for holder in wallets if holder["label"] == "Deployer") if supply and deployer else None
+    }
+
+    with holder_cache_lock:
+        holder_cache[token_mint_address] = (time.time(), analysis)
+        holder_cache.move_to_end(token_mint_address)
+        while len(holder_cache) > MAX_CACHED_HOLDERS:
+            holder_cache.popitem(last=False)
+    return analysis
+
+def get_token_metadata(token_mint_address, include_market_data=True):
     payload = {
         "jsonrpc": "2.0",
         "id": "my-id",
@@ -82,17 +188,20 @@ def get_token_metadata(token_mint_address):
                 "pump_fun": "https://pump.fun/" + token_mint_address
             })
 
-            # Fetch and add the largest token accounts
-            largest_accounts = get_token_largest_accounts(token_mint_address)
-            top_5_accounts = largest_accounts[:5]
-            token_metadata["largest_accounts"] = [
-                {"address": account["address"], "balance": account["uiAmount"]} for account in top_5_accounts
-            ]
-
-            pump_url = token_metadata.get("pump_fun")
-            pump_fun_data = pump_fun_scraper.scrape_pump_fun(pump_url, token_mint_address)
-            if pump_fun_data:
-                token_metadata.update(pump_fun_data)
+            # Fetch and add the largest holders, the first creator is the deployer unless the curve says otherwise
+            creators = result.get("creators") or []
+            deployer = creators[0].get("address") if creators else None
+            try:
+                token_metadata.update(get_holder_analysis(token_mint_address, supply, deployer))
+            except Exception as e:
+                # Post without holder data rather than with a wrong concentration
+                print(f"Error fetching holder analysis: {e}")
+
+            # Market data is only meaningful for live calls, skip the subscription otherwise
+            if include_market_data:
+                market_data = bonding_curve.get_market_data(token_mint_address)
+                if market_data:
+                    token_metadata.update(market_data)
 
             return token_metadata
         else:
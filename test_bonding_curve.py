@@ -0,0 +1,148 @@
+import json
+import base64
+import asyncio
+import itertools
+import pytest
+import websockets
+import bonding_curve
+from bonding_curve import BondingCurveFeed
+
+MINT_A = 'So11111111111111111111111111111111111111112'
+MINT_B = 'TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA'
+MINT_C = 'ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL'
+
+def curve_bytes(virtual_token_reserves=1_073_000_000 * 10 ** 6, virtual_sol_reserves=30 * 10 ** 9,
+                real_token_reserves=793_100_000 * 10 ** 6, real_sol_reserves=0, complete=False, creator=None):
+    data = bonding_curve.BONDING_CURVE_LAYOUT.pack(b'\x17\xb7\xf87`\xd8\xacp', virtual_token_reserves, virtual_sol_reserves,
+                                                  real_token_reserves, real_sol_reserves, 10 ** 15, complete)
+    if creator:
+        data += bonding_curve.b58decode(creator)
+    return data
+
+def test_find_program_address():
+    assert bonding_curve.find_program_address([b'global'], bonding_curve.PUMP_FUN_PROGRAM_ID) == ('4wTV1YmiEkRvAtNtsSGPtUrqRYQMe5SKy2uB4Jjaxnjf', 255)
+
+def test_base58_round_trip():
+    assert bonding_curve.b58encode(bonding_curve.b58decode(MINT_A)) == MINT_A
+    assert bonding_curve.b58decode('11111111111111111111111111111111') == bytes(32)
+
+def test_decode_bonding_curve():
+    curve = bonding_curve.decode_bonding_curve(curve_bytes(real_sol_reserves=5 * 10 ** 9, creator=MINT_A))
+    assert curve == {
+        'virtual_token_reserves': 1_073_000_000 * 10 ** 6,
+        'virtual_sol_reserves': 30 * 10 ** 9,
+        'real_token_reserves': 793_100_000 * 10 ** 6,
+        'real_sol_reserves': 5 * 10 ** 9,
+        'token_total_supply': 10 ** 15,
+        'complete': False,
+        'creator': MINT_A
+    }
+    assert bonding_curve.decode_bonding_curve(curve_bytes())['creator'] is None
+    assert bonding_curve.decode_bonding_curve(curve_bytes()[:40]) is None
+
+def test_compute_market_data():
+    data = bonding_curve.compute_market_data(bonding_curve.decode_bonding_curve(curve_bytes(real_sol_reserves=10 ** 9)), sol_price=100)
+    assert data['bonding_curve_progress'] == '0.00%'
+    assert data['market_cap'] == pytest.approx(2795.899, rel=1e-6)
+    assert data['liquidity'] == pytest.approx(100)
+
+    half_sold = bonding_curve.decode_bonding_curve(curve_bytes(real_token_reserves=396_550_000 * 10 ** 6))
+    assert bonding_curve.compute_market_data(half_sold) == {'bonding_curve_progress': '50.00%'}
+    assert bonding_curve.compute_market_data(bonding_curve.decode_bonding_curve(curve_bytes(complete=True)))['bonding_curve_progress'] == '100.00%'
+
+# Minimal stand-in for the RPC WebSocket, it confirms subscriptions and pushes notifications on request
+class StandInServer:
+    def __init__(self):
+        self.connections = []
+        self.received = []  # (connection number, message)
+        self.subscriptions = {}  # account -> (connection, subscription ID)
+        self._subscription_ids = itertools.count(100)
+
+    async def handler(self, ws):
+        self.connections.append(ws)
+        connection_number = len(self.connections)
+        async for raw in ws:
+            message = json.loads(raw)
+            self.received.append((connection_number, message))
+            if message['method'] == 'accountSubscribe':
+                subscription_id = next(self._subscription_ids)
+                self.subscriptions[message['params'][0]] = (ws, subscription_id)
+                await ws.send(json.dumps({"jsonrpc": "2.0", "id": message['id'], "result": subscription_id}))
+            elif message['method'] == 'accountUnsubscribe':
+                await ws.send(json.dumps({"jsonrpc": "2.0", "id": message['id'], "result": True}))
+
+    def subscribed(self, connection_number):
+        return [message['params'][0] for number, message in self.received if number == connection_number and message['method'] == 'accountSubscribe']
+
+    async def notify(self, account, slot, data):
+        ws, subscription_id = self.subscriptions[account]
+        await ws.send(json.dumps({
+            "jsonrpc": "2.0",
+            "method": "accountNotification",
+            "params": {
+                "subscription": subscription_id,
+                "result": {
+                    "context": {"slot": slot},
+                    "value": {"data": [base64.b64encode(data).decode(), "base64"]}
+                }
+            }
+        }))
+
+async def wait_until(condition, timeout=5):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition not met in time")
+
+def test_feed_against_local_websocket(monkeypatch):
+    monkeypatch.setattr(bonding_curve, 'RECONNECT_DELAY', 0)
+    account_a = bonding_curve.get_bonding_curve_address(MINT_A)
+    account_b = bonding_curve.get_bonding_curve_address(MINT_B)
+    account_c = bonding_curve.get_bonding_curve_address(MINT_C)
+
+    async def scenario():
+        server = StandInServer()
+        async with websockets.serve(server.handler, 'localhost', 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            feed = BondingCurveFeed(f'ws://localhost:{port}', None, max_tracked=2)
+            # Seeding goes over HTTP, report the accounts as not created yet
+            feed._fetch_account = lambda account: (0, None)
+            task = asyncio.ensure_future(feed.run())
+            try:
+                # Subscribe and apply a notification
+                feed.track(MINT_A)
+                await wait_until(lambda: account_a in server.subscriptions and feed._subscriptions)
+                await server.notify(account_a, 10, curve_bytes(real_token_reserves=396_550_000 * 10 ** 6))
+                await wait_until(lambda: feed.get_curve(MINT_A))
+                assert feed.get_market_data(MINT_A)['bonding_curve_progress'] == '50.00%'
+
+                # Older state never replaces newer state
+                await server.notify(account_a, 5, curve_bytes())
+                await server.notify(account_a, 11, curve_bytes(real_token_reserves=0))
+                await wait_until(lambda: feed.tokens[MINT_A]['slot'] == 11)
+                assert feed.get_market_data(MINT_A)['bonding_curve_progress'] == '100.00%'
+
+                # The oldest token is unsubscribed once the table is full
+                feed.track(MINT_B)
+                feed.track(MINT_C)
+                await wait_until(lambda: any(message['method'] == 'accountUnsubscribe' for _, message in server.received))
+                assert list(feed.tokens) == [MINT_B, MINT_C]
+                assert server.subscribed(1) == [account_a, account_b, account_c]
+
+                # Everything is subscribed again after a reconnect and stale curves are dropped
+                await wait_until(lambda: len(feed._subscriptions) == 2)
+                await server.notify(account_b, 20, curve_bytes())
+                await wait_until(lambda: feed.get_curve(MINT_B))
+                await server.connections[0].close()
+                await wait_until(lambda: len(server.subscribed(2)) == 2)
+                assert sorted(server.subscribed(2)) == sorted([account_b, account_c])
+                assert feed.get_curve(MINT_B) is None
+
+                await wait_until(lambda: len(feed._subscriptions) == 2)
+                await server.notify(account_b, 30, curve_bytes())
+                await wait_until(lambda: feed.get_curve(MINT_B))
+            finally:
+                task.cancel()
+
+    asyncio.run(scenario())